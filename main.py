@@ -1,7 +1,18 @@
 # main.py
 import os
+import functools
+import hashlib
+import shutil
+import uuid
 import sqlite3
 import random
+from array import array
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.request import pathname2url
+from concurrent.futures import ThreadPoolExecutor
+import queue
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 try:
@@ -9,95 +20,263 @@ try:
 except Exception as e:
     Image = None
     ImageTk = None
+try:
+    import pyvips  # optional: shrink-on-load thumbnails for large images
+except Exception:
+    pyvips = None
+
+VIPS_MODES = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}  # bands -> PIL mode
 
 DB_FILE = "palace.db"
 ASSETS_DIR = "assets"
+THUMB_CACHE_SIZE = 64  # resized PhotoImages kept by the app
+THUMB_POLL_MS = 30  # how often finished thumbnails are picked up by the Tk thread
+ROOMS_PAGE_SIZE = 200  # rooms inserted into the listbox per idle callback
+ITEMS_PAGE_SIZE = 500  # treeview rows inserted per idle callback
+PROGRESS_FLUSH_EVERY = 50  # in-memory progress rows written to disk per flush
+
+# connection settings, applied right after connect (before any transaction
+# is open - foreign_keys is silently ignored inside one)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-65536",  # 64MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",  # needed for ON DELETE CASCADE on items
+)
+# the read-only connection can't change journal mode; WAL is set by the writer
+SQLITE_READ_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# CRUD statements, kept as constants so sqlite3's statement cache hits
+_SQL_ADD_ROOM = "INSERT INTO rooms (name, description) VALUES (?, ?)"
+_SQL_LIST_ROOMS = "SELECT id, name, description FROM rooms ORDER BY id LIMIT ? OFFSET ?"
+_SQL_COUNT_ROOMS = "SELECT COUNT(*) FROM rooms"
+_SQL_DELETE_ROOM = "DELETE FROM rooms WHERE id = ?"
+_SQL_ADD_ITEM = "INSERT INTO items (room_id, name, hint, image_path) VALUES (?, ?, ?, ?)"
+_SQL_LIST_ITEMS = "SELECT id, name, hint, image_path FROM items WHERE room_id = ? ORDER BY id"
+_SQL_ROOM_SNAPSHOT = """
+SELECT r.id, r.name, r.description, i.id, i.name, i.hint, i.image_path
+FROM rooms r LEFT JOIN items i ON i.room_id = r.id
+WHERE r.id = ? ORDER BY i.id
+"""
+_SQL_DELETE_ITEM = "DELETE FROM items WHERE id = ?"
+_SQL_LOG_SEEN = "INSERT INTO mem.progress (item_id, seen_at, note) VALUES (?, ?, ?)"
+_SQL_FLUSH_PROGRESS = """
+INSERT INTO main.progress (item_id, seen_at, note)
+SELECT item_id, seen_at, note FROM mem.progress ORDER BY id
+"""
 
 # ---------------------------
 # Data layer: SQLite + OOP
 # ---------------------------
+def sqlite_timestamp(epoch):
+    """Epoch seconds -> 'YYYY-MM-DD HH:MM:SS' UTC, the CURRENT_TIMESTAMP format."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
 class DB:
     def __init__(self, db_path=DB_FILE):
-        self.conn = sqlite3.connect(db_path)
+        # autocommit: single statements commit on their own, multi-statement
+        # writes go through transaction() (explicit BEGIN IMMEDIATE)
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        for pragma in SQLITE_PRAGMAS:
+            self.conn.execute(pragma)
+        # progress is append-only: log it to memory, flush_progress() moves it to disk
+        self.conn.execute("ATTACH DATABASE ':memory:' AS mem")
+        self._unflushed_progress = 0
         self._ensure_schema()
+        # readers (list_*, practice) get their own connection so, under WAL,
+        # they never wait behind a write on self.conn. In-memory/temp
+        # databases can't be reopened, they read through self.conn.
+        if db_path in ("", ":memory:"):
+            self.read_conn = self.conn
+        else:
+            uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+            self.read_conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+            for pragma in SQLITE_READ_PRAGMAS:
+                self.read_conn.execute(pragma)
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE ... COMMIT around the block, ROLLBACK on error.
+        Nested use joins the outer transaction, so callers can batch
+        several CRUD calls into one commit.
+        """
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
     def _ensure_schema(self):
-        cur = self.conn.cursor()
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS rooms (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            room_id INTEGER,
-            name TEXT,
-            hint TEXT,
-            image_path TEXT,
-            FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE CASCADE
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS progress (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_id INTEGER,
-            seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            note TEXT
-        )
-        """)
-        self.conn.commit()
+        with self.transaction():
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rooms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                description TEXT
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                room_id INTEGER,
+                name TEXT,
+                hint TEXT,
+                image_path TEXT,
+                FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE CASCADE
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS progress (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER,
+                seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                note TEXT
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS mem.progress (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER,
+                seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                note TEXT
+            )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_items_room ON items(room_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_progress_item ON progress(item_id)")
+            # rooms.name is already UNIQUE; the named index just documents the lookup
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_rooms_name ON rooms(name)")
 
     # Room CRUD
     def add_room(self, name, description=""):
-        cur = self.conn.cursor()
-        cur.execute("INSERT INTO rooms (name, description) VALUES (?, ?)", (name, description))
-        self.conn.commit()
-        return cur.lastrowid
+        return self.conn.execute(_SQL_ADD_ROOM, (name, description)).lastrowid
 
-    def list_rooms(self):
-        cur = self.conn.cursor()
-        cur.execute("SELECT id, name, description FROM rooms ORDER BY id")
-        return cur.fetchall()
+    def list_rooms(self, limit=None, offset=0):
+        return self.read_conn.execute(_SQL_LIST_ROOMS, (-1 if limit is None else limit, offset)).fetchall()
+
+    def count_rooms(self):
+        return self.read_conn.execute(_SQL_COUNT_ROOMS).fetchone()[0]
 
     def delete_room(self, room_id):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM rooms WHERE id = ?", (room_id,))
-        self.conn.commit()
+        self.conn.execute(_SQL_DELETE_ROOM, (room_id,))
 
     # Items CRUD
     def add_item(self, room_id, name, hint, image_path):
-        cur = self.conn.cursor()
-        cur.execute("INSERT INTO items (room_id, name, hint, image_path) VALUES (?, ?, ?, ?)",
-                    (room_id, name, hint, image_path))
-        self.conn.commit()
-        return cur.lastrowid
+        return self.conn.execute(_SQL_ADD_ITEM, (room_id, name, hint, image_path)).lastrowid
 
     def list_items(self, room_id):
-        cur = self.conn.cursor()
-        cur.execute("SELECT id, name, hint, image_path FROM items WHERE room_id = ? ORDER BY id", (room_id,))
-        return cur.fetchall()
+        return self.read_conn.execute(_SQL_LIST_ITEMS, (room_id,)).fetchall()
+
+    def get_room_snapshot(self, room_id):
+        """Room row + its items (same shape as list_items) in one query."""
+        rows = self.read_conn.execute(_SQL_ROOM_SNAPSHOT, (room_id,)).fetchall()
+        if not rows:
+            return None, []
+        room = rows[0][:3]
+        items = [row[3:] for row in rows if row[3] is not None]
+        return room, items
 
     def delete_item(self, item_id):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
-        self.conn.commit()
+        self.conn.execute(_SQL_DELETE_ITEM, (item_id,))
 
     # Progress
     def log_seen(self, item_id, note=""):
-        cur = self.conn.cursor()
-        cur.execute("INSERT INTO progress (item_id, note) VALUES (?, ?)", (item_id, note))
-        self.conn.commit()
+        self.log_seen_many((item_id,), note)
+
+    def log_seen_many(self, item_ids, note="", seen_at=None):
+        """
+        Log progress rows. seen_at: epoch seconds per item (parallel to
+        item_ids) for views buffered by the caller; None => now.
+        """
+        # lands in mem.progress; reaches disk every PROGRESS_FLUSH_EVERY rows or on close
+        if seen_at is None:
+            now = time.time()
+            seen_at = [now] * len(item_ids)
+        rows = [(i, sqlite_timestamp(t), note) for i, t in zip(item_ids, seen_at)]
+        with self.transaction():
+            self.conn.executemany(_SQL_LOG_SEEN, rows)
+        self._unflushed_progress += len(rows)
+        if self._unflushed_progress >= PROGRESS_FLUSH_EVERY:
+            self.flush_progress()
+
+    def flush_progress(self):
+        if not self._unflushed_progress:
+            return
+        with self.transaction():
+            self.conn.execute(_SQL_FLUSH_PROGRESS)
+            self.conn.execute("DELETE FROM mem.progress")
+        self._unflushed_progress = 0
 
     def close(self):
+        self.flush_progress()
+        if self.read_conn is not self.conn:
+            self.read_conn.close()
         self.conn.close()
 
 
 # ---------------------------
 # Generator for daily practice
 # ---------------------------
+class PracticeDeck:
+    """
+    Practice items stored column-wise: ids in an array, the text columns in
+    parallel lists, so a deck holds no per-row tuples. get(i) rebuilds the
+    (id, room_id, name, hint, image_path) row when one is needed.
+    """
+    def __init__(self, rows=()):
+        self.ids = array("q")
+        self.room_ids = []
+        self.names = []
+        self.hints = []
+        self.paths = []
+        for item_id, room_id, name, hint, path in rows:
+            self.ids.append(item_id)
+            self.room_ids.append(room_id)
+            self.names.append(name)
+            self.hints.append(hint)
+            self.paths.append(path)
+
+    @classmethod
+    def load(cls, db: DB, rooms=None):
+        """One query, streamed from the cursor straight into the columns."""
+        if rooms:
+            placeholder = ",".join("?" for _ in rooms)
+            cur = db.read_conn.execute(f"SELECT items.id, items.room_id, items.name, items.hint, items.image_path FROM items WHERE room_id IN ({placeholder}) ORDER BY id", tuple(rooms))
+        else:
+            cur = db.read_conn.execute("SELECT items.id, items.room_id, items.name, items.hint, items.image_path FROM items ORDER BY id")
+        return cls(cur)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, i):
+        return self.ids[i], self.room_ids[i], self.names[i], self.hints[i], self.paths[i]
+
+    def order(self, shuffle=True, repeat=False):
+        """Yield deck indices; the index array is reshuffled in place each pass."""
+        idx = array("q", range(len(self.ids)))
+        if not idx:
+            return
+        while True:
+            if shuffle:
+                random.shuffle(idx)
+            yield from idx
+            if not repeat:
+                break
+
+
 def practice_generator(db: DB, rooms=None, shuffle=True, repeat=False):
     """
     Generator that yields (room_id, item_row) in a practice sequence.
@@ -105,25 +284,68 @@ def practice_generator(db: DB, rooms=None, shuffle=True, repeat=False):
     - shuffle: shuffle items order
     - repeat: if True, loops forever (careful!)
     """
-    # fetch all items
-    cur = db.conn.cursor()
-    if rooms:
-        placeholder = ",".join("?" for _ in rooms)
-        cur.execute(f"SELECT items.id, items.room_id, items.name, items.hint, items.image_path FROM items WHERE room_id IN ({placeholder})", tuple(rooms))
-    else:
-        cur.execute("SELECT items.id, items.room_id, items.name, items.hint, items.image_path FROM items")
-    items = cur.fetchall()  # list of tuples
-    if not items:
-        return  # generator will stop immediately
-
-    while True:
-        sequence = list(items)
-        if shuffle:
-            random.shuffle(sequence)
-        for it in sequence:
-            yield it  # (id, room_id, name, hint, image_path)
-        if not repeat:
-            break
+    deck = PracticeDeck.load(db, rooms)
+    for i in deck.order(shuffle, repeat):
+        yield deck.get(i)  # (id, room_id, name, hint, image_path)
+
+
+# ---------------------------
+# Image storage in ASSETS_DIR
+# ---------------------------
+def import_image(src):
+    """
+    Copy src into ASSETS_DIR named by a hash of its content and return the
+    name to store in items.image_path. The same picture is only kept once.
+    """
+    src_dir = os.path.dirname(os.path.abspath(src))
+    if src_dir == os.path.abspath(ASSETS_DIR):
+        return os.path.basename(src)  # already in assets
+    h = hashlib.sha1()
+    with open(src, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            h.update(block)
+    ext = os.path.splitext(src)[1].lower() or ".png"
+    name = h.hexdigest()[:16] + ext
+    dest = os.path.join(ASSETS_DIR, name)
+    if not os.path.exists(dest):
+        # copy under a temp name first: a failed copy must never sit at the
+        # hash name, or later imports of the same picture would skip it
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        # a fresh name (not mkstemp, whose 0600 mode copyfile would keep) so
+        # the asset gets the usual umask-based permissions
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return name
+
+
+@functools.lru_cache(maxsize=256)
+def _stat_cached(path, bucket):
+    # bucket = int(time.monotonic()): entries go stale after about a second
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def stat_image(path):
+    """os.stat(path) or None if missing, shared by every check within a second."""
+    return _stat_cached(path, int(time.monotonic()))
+
+
+def image_full_path(stored):
+    """Resolve items.image_path; older rows hold a full or relative path."""
+    if not stored:
+        return ""
+    legacy = stored.replace("\\", "/")
+    if "/" in legacy:
+        return os.path.normpath(legacy)
+    return os.path.join(ASSETS_DIR, stored)
 
 
 # ---------------------------
@@ -137,7 +359,19 @@ class MemoryPalaceApp(tk.Tk):
         self.db = db
         self.current_room_id = None
         self.current_image_ref = None  # keep reference to PhotoImage
-        self.practice_gen = None
+        self._thumb_cache = OrderedDict()  # (path, mtime, max_w, max_h) -> PhotoImage, LRU
+        self._executor = ThreadPoolExecutor(max_workers=2)  # thumbnail decoding
+        self._thumb_results = queue.Queue()  # finished futures, filled by workers
+        self._thumb_pending = 0
+        self._thumb_poll = None  # after() id while results are awaited
+        self._draw_token = 0  # bumped whenever the canvas content changes
+        self._rooms_token = 0  # bumped by refresh_rooms to cancel older paging
+        self._items_token = 0  # same for refresh_items
+        self._current_path = None  # image shown (or decoding) on the canvas, redrawn on resize
+        self._current_pil = None  # ((path, mtime), decoded PIL image) of the last decode
+        self._resize_job = None
+        self.practice_gen = None  # yields indices into practice_deck
+        self.practice_deck = None
         self._build_ui()
         self.refresh_rooms()
 
@@ -185,6 +419,7 @@ class MemoryPalaceApp(tk.Tk):
 
         self.canvas = tk.Canvas(right, bg="#eee")
         self.canvas.pack(fill="both", expand=True)
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
 
         # bottom info
         bottom = ttk.Frame(right)
@@ -194,10 +429,24 @@ class MemoryPalaceApp(tk.Tk):
 
     # ---------- Room / Item operations ----------
     def refresh_rooms(self):
+        # first page now, the rest from after_idle so startup paint stays bounded
         self.rooms_listbox.delete(0, "end")
-        self.rooms = self.db.list_rooms()
-        for r in self.rooms:
+        self.rooms = []
+        self.rooms_by_id = {}
+        self._rooms_token += 1
+        self._rooms_total = self.db.count_rooms()
+        self._refresh_rooms_more(0, self._rooms_token)
+
+    def _refresh_rooms_more(self, offset, token):
+        if token != self._rooms_token:
+            return  # a newer refresh_rooms started over
+        page = self.db.list_rooms(ROOMS_PAGE_SIZE, offset)
+        self.rooms.extend(page)
+        for r in page:
+            self.rooms_by_id[r[0]] = r
             self.rooms_listbox.insert("end", f"{r[1]} (#{r[0]})")
+        if page and len(self.rooms) < self._rooms_total:
+            self.after_idle(self._refresh_rooms_more, offset + len(page), token)
 
     def on_room_select(self):
         sel = self.rooms_listbox.curselection()
@@ -206,35 +455,48 @@ class MemoryPalaceApp(tk.Tk):
         idx = sel[0]
         room_id = self.rooms[idx][0]
         self.current_room_id = room_id
-        self.refresh_items(room_id)
-        self.draw_room(room_id)
+        room, items = self.db.get_room_snapshot(room_id)
+        self.refresh_items(room_id, items)
+        self.draw_room(room_id, items, room)
 
-    def draw_room(self, room_id):
+    def draw_room(self, room_id, items=None, room=None):
         # simple drawing: room title + thumbnail of first item if exists
-        self.canvas.delete("all")
-        room = next((r for r in self.rooms if r[0] == room_id), None)
+        self._clear_canvas()
+        if room is None:
+            room = self.rooms_by_id.get(room_id)
         if not room:
             return
         self.canvas.create_text(10, 10, anchor="nw", text=f"اتاق: {room[1]}", font=("TkDefaultFont", 16, "bold"))
-        items = self.db.list_items(room_id)
+        if items is None:
+            items = self.db.list_items(room_id)
         if items:
             # show first item image as preview
-            img_path = items[0][3]  # image_path
-            if img_path and os.path.exists(img_path):
+            img_path = image_full_path(items[0][3])
+            if img_path and stat_image(img_path):
                 self._draw_image_on_canvas(img_path)
             else:
                 self.canvas.create_text(20, 50, anchor="nw", text="تصویر پیدا نشد.", fill="red")
         else:
             self.canvas.create_text(20, 50, anchor="nw", text="اتاق خالی است. آیتم اضافه کنید.")
 
-    def refresh_items(self, room_id):
-        for i in self.items_tree.get_children():
-            self.items_tree.delete(i)
-        rows = self.db.list_items(room_id)
-        for row in rows:
-            iid = f"item-{row[0]}"
+    def refresh_items(self, room_id, rows=None):
+        self.items_tree.delete(*self.items_tree.get_children())
+        if rows is None:
+            rows = self.db.list_items(room_id)
+        self._items_token += 1
+        self._insert_items(rows, 0, self._items_token)
+
+    def _insert_items(self, rows, start, token):
+        if token != self._items_token:
+            return  # the tree was refreshed again meanwhile
+        # raw Tcl insert, skipping ttk.Treeview.insert's option formatting
+        call, w = self.items_tree.tk.call, self.items_tree._w
+        end = start + ITEMS_PAGE_SIZE
+        for row in rows[start:end]:
             imgname = os.path.basename(row[3]) if row[3] else ""
-            self.items_tree.insert("", "end", iid=iid, values=(row[2], imgname))
+            call(w, "insert", "", "end", "-id", f"item-{row[0]}", "-values", (row[2], imgname))
+        if end < len(rows):
+            self.after_idle(self._insert_items, rows, end, token)
 
     def add_room_dialog(self):
         dlg = tk.Toplevel(self)
@@ -269,7 +531,7 @@ class MemoryPalaceApp(tk.Tk):
             self.current_room_id = None
             self.refresh_rooms()
             self.items_tree.delete(*self.items_tree.get_children())
-            self.canvas.delete("all")
+            self._clear_canvas()
 
     def add_item_dialog(self):
         if not self.current_room_id:
@@ -299,21 +561,13 @@ class MemoryPalaceApp(tk.Tk):
             if not name:
                 messagebox.showwarning("خطا", "نام آیتم لازم است.")
                 return
-            # optionally copy image to assets
+            # optionally copy image to assets (stored by name only)
             final_path = imgpath
             if imgpath and os.path.exists(imgpath):
-                # copy into assets directory
-                if not os.path.isdir(ASSETS_DIR):
-                    os.makedirs(ASSETS_DIR, exist_ok=True)
-                dest = os.path.join(ASSETS_DIR, os.path.basename(imgpath))
-                # if source != dest then copy
-                if os.path.abspath(imgpath) != os.path.abspath(dest):
-                    try:
-                        with open(imgpath, "rb") as rf, open(dest, "wb") as wf:
-                            wf.write(rf.read())
-                    except Exception as e:
-                        messagebox.showwarning("هشدار", f"کپی تصویر به پوشه assets ناموفق بود: {e}")
-                final_path = dest
+                try:
+                    final_path = import_image(imgpath)
+                except Exception as e:
+                    messagebox.showwarning("هشدار", f"کپی تصویر به پوشه assets ناموفق بود: {e}")
             self.db.add_item(self.current_room_id, name, hint, final_path)
             self.refresh_items(self.current_room_id)
             dlg.destroy()
@@ -331,32 +585,139 @@ class MemoryPalaceApp(tk.Tk):
             self.refresh_items(self.current_room_id)
 
     # ---------- Image helper ----------
+    def _clear_canvas(self):
+        self._draw_token += 1  # drop thumbnails still being decoded for the old view
+        self._current_path = None
+        self.canvas.delete("all")
+
+    @staticmethod
+    def _load_thumbnail(path, max_w, max_h, source=None):
+        # runs on a worker thread: PIL/vips only, no Tk calls here.
+        # returns (decoded full-resolution image or None, thumbnail)
+        try:
+            resample = Image.Resampling.LANCZOS
+        except AttributeError:
+            resample = Image.LANCZOS
+
+        def fit(img):
+            # like thumbnail() (never upscales) but into a new image, no copy first
+            scale = min(max_w / img.width, max_h / img.height, 1)
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            return img.resize(size, resample) if size != img.size else img.copy()
+
+        if source is not None:  # resize only: resample the already decoded image
+            return source, fit(source)
+        if pyvips is not None:
+            try:
+                vimg = pyvips.Image.thumbnail(path, max_w, height=max_h, size="down")
+                if vimg.format != "uchar":
+                    # rescale 16-bit/float to 8-bit; a plain cast would clip to 255
+                    vimg = vimg.colourspace("b-w" if vimg.bands <= 2 else "srgb")
+                    if vimg.format != "uchar":
+                        raise ValueError(f"unsupported vips format {vimg.format}")
+                mode = VIPS_MODES[vimg.bands]
+                return None, Image.frombuffer(mode, (vimg.width, vimg.height), vimg.write_to_memory(), "raw", mode, 0, 1)
+            except Exception:
+                pass  # unsupported file/band layout, fall back to PIL
+        source = Image.open(path)
+        full_size = source.size
+        # JPEG: let the decoder downscale (DCT scaling) as thumbnail() did
+        source.draft(source.mode, (max_w, max_h))
+        img = fit(source)
+        # a drafted image is below full resolution, so it is not kept for
+        # later resizes; those re-read the file, again at draft size
+        return (source if source.size == full_size else None), img
+
     def _draw_image_on_canvas(self, path):
-        self.canvas.delete("img")
+        # _current_path is only set while the image is shown or still decoding,
+        # so next_practice never keeps an error message in place of a picture
         if Image is None:
+            self._current_path = None
+            self.canvas.delete("img")
             self.canvas.create_text(20, 50, anchor="nw", text="PIL نصب نشده، نمایش تصویر ممکن نیست.", fill="red")
             return
         try:
-            img = Image.open(path)
             # scale to fit canvas
             c_w = self.canvas.winfo_width() or 400
             c_h = self.canvas.winfo_height() or 300
             max_w = int(c_w * 0.8)
             max_h = int(c_h * 0.6)
+            st = stat_image(path)
+            if st is None:
+                raise FileNotFoundError(path)
+            key = (path, st.st_mtime, max_w, max_h)
+        except Exception as e:
+            self._current_path = None
+            self.canvas.delete("img")
+            self.canvas.create_text(20, 50, anchor="nw", text=f"خطا در بارگذاری تصویر: {e}", fill="red")
+            return
+        self._current_path = path
+        self._draw_token += 1
+        photo = self._thumb_cache.get(key)
+        if photo is not None:
+            self._thumb_cache.move_to_end(key)
+            self._show_photo(photo, c_w, c_h)
+            return
+        # decode + resize off the Tk thread, PhotoImage is built back on it
+        source = None
+        if self._current_pil is not None and self._current_pil[0] == key[:2]:
+            source = self._current_pil[1]
+        token = self._draw_token
+        fut = self._executor.submit(self._load_thumbnail, path, max_w, max_h, source)
+        # the callback runs on the worker: no Tk there, just hand over the result
+        fut.add_done_callback(lambda f: self._thumb_results.put((f, key, token, c_w, c_h)))
+        self._thumb_pending += 1
+        if self._thumb_poll is None:
+            self._thumb_poll = self.after(THUMB_POLL_MS, self._drain_thumbnails)
+
+    def _on_canvas_configure(self, event):
+        # debounce: redraw once the user stops resizing
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(150, self._redraw_after_resize)
+
+    def _redraw_after_resize(self):
+        self._resize_job = None
+        if self._current_path:
+            self._draw_image_on_canvas(self._current_path)
+
+    def _drain_thumbnails(self):
+        # Tk thread: finish every decoded thumbnail, keep polling while some are pending
+        self._thumb_poll = None
+        while True:
             try:
-                resample = Image.Resampling.LANCZOS
-            except AttributeError:
-                resample = Image.LANCZOS
-
-            img.thumbnail((max_w, max_h), resample)
-
+                result = self._thumb_results.get_nowait()
+            except queue.Empty:
+                break
+            self._thumb_pending -= 1
+            self._finish_draw(*result)
+        if self._thumb_pending:
+            self._thumb_poll = self.after(THUMB_POLL_MS, self._drain_thumbnails)
+
+    def _finish_draw(self, fut, key, token, c_w, c_h):
+        if token != self._draw_token:
+            return  # canvas moved on to another room/item meanwhile
+        try:
+            source, img = fut.result()
             photo = ImageTk.PhotoImage(img)
-            self.current_image_ref = photo  # keep ref
-            x = c_w // 2
-            y = c_h // 2 + 20
-            self.canvas.create_image(x, y, image=photo, anchor="center", tags="img")
         except Exception as e:
+            self._current_path = None
+            self.canvas.delete("img")
             self.canvas.create_text(20, 50, anchor="nw", text=f"خطا در بارگذاری تصویر: {e}", fill="red")
+            return
+        if source is not None:
+            self._current_pil = (key[:2], source)
+        self._thumb_cache[key] = photo
+        if len(self._thumb_cache) > THUMB_CACHE_SIZE:
+            self._thumb_cache.popitem(last=False)
+        self._show_photo(photo, c_w, c_h)
+
+    def _show_photo(self, photo, c_w, c_h):
+        self.canvas.delete("img")
+        self.current_image_ref = photo  # keep ref, even if evicted from the cache
+        x = c_w // 2
+        y = c_h // 2 + 20
+        self.canvas.create_image(x, y, image=photo, anchor="center", tags="img")
 
     # ---------- Practice controls ----------
     def start_practice(self):
@@ -367,12 +728,15 @@ class MemoryPalaceApp(tk.Tk):
             # only selected room
             idx = rooms_sel[0]
             rooms = [self.rooms[idx][0]]
-        self.practice_gen = practice_generator(self.db, rooms=rooms, shuffle=True, repeat=False)
+        self.practice_deck = PracticeDeck.load(self.db, rooms=rooms)
+        self.practice_gen = self.practice_deck.order(shuffle=True, repeat=False)
         self.practice_status.config(text="حالت: در حال تمرین")
         self.next_practice()
 
     def stop_practice(self):
         self.practice_gen = None
+        self.practice_deck = None
+        self.db.flush_progress()  # end of session: don't leave it in memory
         self.practice_status.config(text="حالت: متوقف")
 
     def next_practice(self):
@@ -380,27 +744,40 @@ class MemoryPalaceApp(tk.Tk):
             messagebox.showinfo("اطلاع", "ابتدا 'شروع تمرین' را بزنید.")
             return
         try:
-            it = next(self.practice_gen)
+            i = next(self.practice_gen)
         except StopIteration:
             messagebox.showinfo("پایان", "سلسله تمرین به پایان رسید.")
             self.stop_practice()
             return
-        # it = (id, room_id, name, hint, image_path)
-        item_id, room_id, name, hint, image_path = it
-        # show on canvas
-        self.canvas.delete("all")
+        deck = self.practice_deck
+        item_id = deck.ids[i]
+        name = deck.names[i]
+        hint = deck.hints[i]
+        image_path = image_full_path(deck.paths[i])
+        # show on canvas; the same picture as the previous item stays as it is
+        # (shown, or still decoding) and only the labels are redrawn
+        same_image = bool(image_path) and image_path == self._current_path
+        if same_image:
+            self.canvas.delete("!img")
+        else:
+            self._clear_canvas()
         self.canvas.create_text(10, 10, anchor="nw", text=f"تمرین: {name}", font=("TkDefaultFont", 18, "bold"))
         self.canvas.create_text(10, 40, anchor="nw", text=f"سرنخ: {hint}")
-        if image_path and os.path.exists(image_path):
+        if same_image:
+            pass
+        elif image_path and stat_image(image_path):
             self._draw_image_on_canvas(image_path)
         else:
             self.canvas.create_text(20, 70, anchor="nw", text="بدون تصویر برای این آیتم.", fill="gray")
-        # log progress
+        # log progress (buffered in mem.progress, flushed every PROGRESS_FLUSH_EVERY)
         self.db.log_seen(item_id)
         self.practice_status.config(text=f"آخرین آیتم: {name}")
 
     def on_closing(self):
         if messagebox.askokcancel("خروج", "آیا مایل به خروج هستید؟"):
+            if self._thumb_poll is not None:
+                self.after_cancel(self._thumb_poll)
+            self._executor.shutdown(wait=False)
             self.db.close()
             self.destroy()
 
@@ -418,8 +795,7 @@ def ensure_assets_example():
         dest = os.path.join(ASSETS_DIR, "winged_cat.png")
         try:
             if not os.path.exists(dest):
-                with open(example_src, "rb") as rf, open(dest, "wb") as wf:
-                    wf.write(rf.read())
+                shutil.copyfile(example_src, dest)
         except Exception:
             pass
 
@@ -428,14 +804,14 @@ if __name__ == "__main__":
     ensure_assets_example()
     db = DB()
     # create sample room & item if empty
-    if not db.list_rooms():
-        r_id = db.add_room("اتاق اول", "اتاق نمونه برای شروع")
-        # attempt to add the example image if exists
-        example_img = os.path.join(ASSETS_DIR, "winged_cat.png")
-        if os.path.exists(example_img):
-            db.add_item(r_id, "گربه بالدار", "تصویر گربه با بال طلایی", example_img)
-        else:
-            db.add_item(r_id, "گربه خیالی", "گربه‌ای با بال طلایی (بدون تصویر)", "")
+    if not db.count_rooms():
+        with db.transaction():
+            r_id = db.add_room("اتاق اول", "اتاق نمونه برای شروع")
+            # attempt to add the example image if exists
+            if os.path.exists(image_full_path("winged_cat.png")):
+                db.add_item(r_id, "گربه بالدار", "تصویر گربه با بال طلایی", "winged_cat.png")
+            else:
+                db.add_item(r_id, "گربه خیالی", "گربه‌ای با بال طلایی (بدون تصویر)", "")
     app = MemoryPalaceApp(db)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()